@@ -8,12 +8,27 @@ Generate the data file locally with:
     python examples/subject_hierarchy_explorer.py --export-data precomputed.json
 """
 
-import json
+import argparse
+import functools
+import gzip
+import hashlib
+import heapq
 import os
+import re
+import sys
+import threading
 import time
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass
 from pathlib import Path
-from flask import Flask, render_template_string, request, jsonify
+
+import brotli
+import csscompressor
+import msgpack
+import numpy as np
+import orjson
+import rjsmin
+from flask import Flask, Response, request, jsonify
 
 app = Flask(__name__)
 
@@ -22,6 +37,73 @@ app = Flask(__name__)
 # Co-occurrence Engine (precomputed data only)
 # =============================================================================
 
+@dataclass(slots=True)
+class Rel:
+    """One precomputed narrower -> broader relationship row."""
+    narrower_id: str
+    broader_id: str
+    narrower_name: str
+    broader_name: str
+    cooc_count: int
+    narrower_count: int
+    broader_count: int
+    p_broader_given_narrower: float
+    p_narrower_given_broader: float
+    asymmetry: float
+
+
+# Filter/sort columns built from the relationship rows: engine attribute ->
+# (Rel field, dtype, file in the binary data directory). Counts fit easily
+# in int32 and the probabilities need no more than float32 precision, so
+# the filter scans move half the bytes of the float64/int64 defaults.
+REL_COLUMNS = {
+    'rel_narr_cnt': ('narrower_count', np.int32, 'rels_narr_cnt.i32'),
+    'rel_cooc': ('cooc_count', np.int32, 'rels_cooc.i32'),
+    'rel_p': ('p_broader_given_narrower', np.float32, 'rels_p.f32'),
+    'rel_asym': ('asymmetry', np.float32, 'rels_asym.f32'),
+}
+
+# String tables and display values of the binary data directory
+BINARY_TABLES = 'names.msgpack'
+
+
+# Array kernels over the relationship columns. They take and return plain
+# NumPy arrays only, so they stay independent of the row objects.
+
+def _threshold_mask(col, threshold):
+    """Read-only boolean mask of col >= threshold."""
+    # Cast float thresholds so the comparison runs in the column dtype and
+    # never promotes a whole column to float64.
+    if col.dtype.kind == 'f':
+        threshold = col.dtype.type(threshold)
+    mask = col >= threshold
+    mask.flags.writeable = False
+    return mask
+
+
+def _sort_indices(idx, sort_key, desc, limit=None):
+    """Reorder idx by sort_key[idx]; ties keep their order either way.
+
+    With a positive limit smaller than idx, only the first limit entries of
+    the full ordering are returned.
+    """
+    keys = sort_key[idx]
+    # Negate rather than reverse so descending ties match a stable sort
+    # with reverse=True.
+    if desc:
+        keys = -keys
+    if limit is not None and 0 < limit < keys.size:
+        # Partial selection: everything strictly below the limit-th key,
+        # plus as many of the tied keys as still fit, earliest first.
+        kth = np.partition(keys, limit - 1)[limit - 1]
+        below = np.flatnonzero(keys < kth)
+        ties = np.flatnonzero(keys == kth)[:limit - below.size]
+        keep = np.sort(np.concatenate((below, ties)))
+        idx, keys = idx[keep], keys[keep]
+    order = np.argsort(keys, kind='stable')
+    return idx[order]
+
+
 class CooccurrenceEngine:
     """Serves precomputed subject co-occurrence statistics."""
 
@@ -29,113 +111,272 @@ class CooccurrenceEngine:
         self.concept_names: dict[str, str] = {}
         self.concept_counts: dict[str, int] = {}
         self.total_citations = 0
-        self.relationships: list[dict] = []
+        self.relationships: list[Rel] = []
+        # Struct-of-arrays columns parallel to self.relationships, used for
+        # vectorized filtering and sorting.
+        self.rel_narr_cnt = np.empty(0, dtype=np.int32)
+        self.rel_cooc = np.empty(0, dtype=np.int32)
+        self.rel_p = np.empty(0, dtype=np.float32)
+        self.rel_asym = np.empty(0, dtype=np.float32)
+        # Lowercased relationship names, for the substring concept filter
+        self._narr_name_lower: list[str] = []
+        self._broad_name_lower: list[str] = []
+        # Sort keys for the name columns: rank of each lowercased name.
+        self.rel_narr_name_rank = np.empty(0, dtype=np.int32)
+        self.rel_broad_name_rank = np.empty(0, dtype=np.int32)
+        # Each relationship pre-encoded as a JSON object, for fast responses
+        self.rel_json: list[bytes] = []
+        # Lowercased concept names for lookups and substring suggestions.
+        self._name_to_id: dict[str, str] = {}
+        self._lower_names: list[tuple[str, str]] = []
+        # Trigram -> positions in self._lower_names of names containing it
+        self._trigram_index: dict[str, list[int]] = {}
+        # Relationship indices (into self.relationships) keyed by concept id
+        self.by_narrower: dict[str, list[int]] = defaultdict(list)
+        self.by_broader: dict[str, list[int]] = defaultdict(list)
+        # Per-column threshold masks, memoized so that changing one filter
+        # threshold only rescans that column
+        self._column_mask = functools.lru_cache(maxsize=64)(self._build_column_mask)
         self._loaded = False
 
     def load_precomputed(self, path: str):
+        """Load a JSON data file, or a binary data directory written by export_binary."""
         if self._loaded:
             return
         t0 = time.time()
-        with open(path, 'r') as f:
-            data = json.load(f)
-        self.concept_names = data['concept_names']
-        self.concept_counts = data['concept_counts']
-        self.total_citations = data['total_citations']
-        self.relationships = data['relationships']
+        if os.path.isdir(path):
+            self._load_binary(path)
+        else:
+            self._load_json(path)
+        self._intern_strings()
+        self._build_name_columns()
+        self.rel_json = [orjson.dumps(r) for r in self.relationships]
+        self._build_name_index()
+        self._build_adjacency()
         self._loaded = True
         t1 = time.time()
         print(f"Loaded precomputed data: {len(self.concept_names)} concepts, "
               f"{len(self.relationships)} relationships in {t1-t0:.1f}s")
 
-    def get_filtered_relationships(self, min_narrower_count=10, min_cooc=5,
+    def _load_json(self, path: str):
+        with open(path, 'rb') as f:
+            data = orjson.loads(f.read())
+        self.concept_names = data['concept_names']
+        self.concept_counts = data['concept_counts']
+        self.total_citations = data['total_citations']
+        self.relationships = [Rel(**r) for r in data['relationships']]
+        self._build_columns()
+
+    def _load_binary(self, path: str):
+        # The filter columns are mapped straight from disk; only the string
+        # tables and the exact display values need to be unpacked.
+        with open(os.path.join(path, BINARY_TABLES), 'rb') as f:
+            tables = msgpack.unpackb(f.read(), raw=False)
+        self.concept_names = tables['concept_names']
+        self.concept_counts = tables['concept_counts']
+        self.total_citations = tables['total_citations']
+        # A partial or stale export must fail here, not at request time
+        n = len(tables['narr_id'])
+        for attr, (_, dtype, filename) in REL_COLUMNS.items():
+            col = np.memmap(os.path.join(path, filename),
+                            dtype=np.dtype(dtype).newbyteorder('<'), mode='r')
+            if len(col) != n:
+                raise ValueError(f"{filename} has {len(col)} rows, expected {n}")
+            setattr(self, attr, col)
+        # Positional order follows the Rel fields
+        try:
+            self.relationships = [Rel(*row) for row in zip(
+                tables['narr_id'], tables['broad_id'], tables['narr_name'], tables['broad_name'],
+                self.rel_cooc.tolist(), self.rel_narr_cnt.tolist(), tables['broad_cnt'],
+                tables['p'], tables['p_rev'], tables['asym'],
+                strict=True,
+            )]
+        except ValueError:
+            raise ValueError(f"{BINARY_TABLES} row tables do not all have {n} rows") from None
+
+    def export_binary(self, out_dir: str):
+        """Write the loaded data as a binary data directory for load_precomputed."""
+        os.makedirs(out_dir, exist_ok=True)
+        for attr, (_, dtype, filename) in REL_COLUMNS.items():
+            col = getattr(self, attr).astype(np.dtype(dtype).newbyteorder('<'))
+            col.tofile(os.path.join(out_dir, filename))
+        rels = self.relationships
+        tables = {
+            'concept_names': self.concept_names,
+            'concept_counts': self.concept_counts,
+            'total_citations': self.total_citations,
+            'narr_id': [r.narrower_id for r in rels],
+            'broad_id': [r.broader_id for r in rels],
+            'narr_name': [r.narrower_name for r in rels],
+            'broad_name': [r.broader_name for r in rels],
+            'broad_cnt': [r.broader_count for r in rels],
+            # Full-precision copies for the API output; the float32 files
+            # are only used for filtering and sorting.
+            'p': [r.p_broader_given_narrower for r in rels],
+            'p_rev': [r.p_narrower_given_broader for r in rels],
+            'asym': [r.asymmetry for r in rels],
+        }
+        with open(os.path.join(out_dir, BINARY_TABLES), 'wb') as f:
+            f.write(msgpack.packb(tables))
+
+    def _intern_strings(self):
+        # Ids and names repeat across many relationship rows; interning makes
+        # every row share one string object per distinct value.
+        intern = sys.intern
+        self.concept_names = {intern(k): intern(v) for k, v in self.concept_names.items()}
+        self.concept_counts = {intern(k): v for k, v in self.concept_counts.items()}
+        for r in self.relationships:
+            r.narrower_id = intern(r.narrower_id)
+            r.broader_id = intern(r.broader_id)
+            r.narrower_name = intern(r.narrower_name)
+            r.broader_name = intern(r.broader_name)
+
+    def _build_columns(self):
+        rels = self.relationships
+        n = len(rels)
+        for attr, (field, dtype, _) in REL_COLUMNS.items():
+            try:
+                col = np.fromiter((getattr(r, field) for r in rels), dtype=dtype, count=n)
+            except OverflowError:
+                raise ValueError(f"{field} values do not fit in {np.dtype(dtype).name}") from None
+            setattr(self, attr, col)
+
+    def _build_name_columns(self):
+        rels = self.relationships
+        n = len(rels)
+        narr_lower = self._narr_name_lower = [r.narrower_name.lower() for r in rels]
+        broad_lower = self._broad_name_lower = [r.broader_name.lower() for r in rels]
+        rank = {name: i for i, name in enumerate(sorted(set(narr_lower) | set(broad_lower)))}
+        self.rel_narr_name_rank = np.fromiter((rank[x] for x in narr_lower), dtype=np.int32, count=n)
+        self.rel_broad_name_rank = np.fromiter((rank[x] for x in broad_lower), dtype=np.int32, count=n)
+
+    def _build_name_index(self):
+        self._lower_names = [(name.lower(), cbid) for cbid, name in self.concept_names.items()]
+        self._name_to_id = {}
+        for name_lower, cbid in self._lower_names:
+            # First concept wins on case-insensitive duplicates
+            self._name_to_id.setdefault(name_lower, cbid)
+
+        trigram_index = defaultdict(list)
+        for pos, (name_lower, _) in enumerate(self._lower_names):
+            for gram in {name_lower[i:i + 3] for i in range(len(name_lower) - 2)}:
+                trigram_index[gram].append(pos)
+        self._trigram_index = dict(trigram_index)
+
+    def _suggestion_candidates(self, query_lower):
+        """Positions in self._lower_names that may contain query_lower, in order."""
+        if len(query_lower) < 3:
+            return range(len(self._lower_names))
+        postings = []
+        for gram in {query_lower[i:i + 3] for i in range(len(query_lower) - 2)}:
+            positions = self._trigram_index.get(gram)
+            if positions is None:
+                return ()
+            postings.append(positions)
+        postings.sort(key=len)
+        return sorted(set(postings[0]).intersection(*postings[1:]))
+
+    def _build_adjacency(self):
+        self.by_narrower = defaultdict(list)
+        self.by_broader = defaultdict(list)
+        for i, r in enumerate(self.relationships):
+            self.by_narrower[r.narrower_id].append(i)
+            self.by_broader[r.broader_id].append(i)
+
+    def _build_column_mask(self, attr, threshold):
+        return _threshold_mask(getattr(self, attr), threshold)
+
+    def _filter_indices(self, min_count, min_cooc, min_p, min_asym):
+        """Row indices passing all four thresholds, in row order."""
+        mask = (self._column_mask('rel_narr_cnt', min_count) &
+                self._column_mask('rel_cooc', min_cooc) &
+                self._column_mask('rel_p', min_p) &
+                self._column_mask('rel_asym', min_asym))
+        return np.flatnonzero(mask)
+
+    def filter_relationship_indices(self, min_narrower_count=10, min_cooc=5,
                                     min_p_broader=0.3, min_asymmetry=1.5,
                                     concept_filter=None, sort_by='asymmetry',
                                     sort_desc=True, limit=500):
-        results = []
+        """Return (row indices, total matches); indices are sorted and cut to limit."""
         concept_filter_lower = concept_filter.lower().strip() if concept_filter else None
 
-        for r in self.relationships:
-            if r['narrower_count'] < min_narrower_count:
-                continue
-            if r['cooc_count'] < min_cooc:
-                continue
-            if r['p_broader_given_narrower'] < min_p_broader:
-                continue
-            if r['asymmetry'] < min_asymmetry:
-                continue
-            if concept_filter_lower:
-                if (concept_filter_lower not in r['narrower_name'].lower() and
-                    concept_filter_lower not in r['broader_name'].lower()):
-                    continue
-            results.append(r)
-
-        reverse = sort_desc
-        if sort_by == 'asymmetry':
-            results.sort(key=lambda r: r['asymmetry'], reverse=reverse)
-        elif sort_by == 'p_broader_given_narrower':
-            results.sort(key=lambda r: r['p_broader_given_narrower'], reverse=reverse)
-        elif sort_by == 'cooc_count':
-            results.sort(key=lambda r: r['cooc_count'], reverse=reverse)
-        elif sort_by == 'narrower_name':
-            results.sort(key=lambda r: r['narrower_name'].lower(), reverse=reverse)
-        elif sort_by == 'broader_name':
-            results.sort(key=lambda r: r['broader_name'].lower(), reverse=reverse)
-
-        return results[:limit], len(results)
+        idx = self._filter_indices(min_narrower_count, min_cooc, min_p_broader, min_asymmetry)
+
+        if concept_filter_lower:
+            narr_lower = self._narr_name_lower
+            broad_lower = self._broad_name_lower
+            idx = np.fromiter(
+                (i for i in idx.tolist()
+                 if concept_filter_lower in narr_lower[i] or
+                    concept_filter_lower in broad_lower[i]),
+                dtype=np.intp)
+
+        sort_keys = {
+            'asymmetry': self.rel_asym,
+            'p_broader_given_narrower': self.rel_p,
+            'cooc_count': self.rel_cooc,
+            'narrower_name': self.rel_narr_name_rank,
+            'broader_name': self.rel_broad_name_rank,
+        }
+        if sort_by in sort_keys:
+            total = len(idx)
+            return _sort_indices(idx, sort_keys[sort_by], sort_desc, limit)[:limit], total
+
+        return idx[:limit], len(idx)
+
+    def get_filtered_relationships(self, limit=500, **filters):
+        """filter_relationship_indices, materialized as Rel rows."""
+        idx, total = self.filter_relationship_indices(limit=limit, **filters)
+        return [self.relationships[i] for i in idx], total
 
     def get_concept_tree(self, concept_name, min_p_broader=0.3, min_asymmetry=1.5,
                          min_cooc=3, min_count=5):
         concept_name_lower = concept_name.lower().strip()
 
-        concept_id = None
-        for cbid, name in self.concept_names.items():
-            if name.lower() == concept_name_lower:
-                concept_id = cbid
-                break
+        concept_id = self._name_to_id.get(concept_name_lower)
 
         if not concept_id:
             matches = []
-            for cbid, name in self.concept_names.items():
-                if concept_name_lower in name.lower():
-                    matches.append({'id': cbid, 'name': name, 'count': self.concept_counts.get(cbid, 0)})
-            matches.sort(key=lambda x: x['count'], reverse=True)
-            return {'suggestions': matches[:20], 'broader': [], 'narrower': [], 'symmetric': []}
+            lower_names = self._lower_names
+            # Candidates come from the trigram index; confirm the actual substring
+            for pos in self._suggestion_candidates(concept_name_lower):
+                name_lower, cbid = lower_names[pos]
+                if concept_name_lower in name_lower:
+                    matches.append({'id': cbid, 'name': self.concept_names[cbid],
+                                    'count': self.concept_counts.get(cbid, 0)})
+            top = heapq.nlargest(20, matches, key=lambda x: x['count'])
+            return {'suggestions': top, 'broader': [], 'narrower': [], 'symmetric': []}
 
         broader = []
         narrower = []
         symmetric = []
 
-        for r in self.relationships:
-            passes_filters = (r['cooc_count'] >= min_cooc and
-                              r['narrower_count'] >= min_count)
-            if not passes_filters:
-                continue
-
-            if r['narrower_id'] == concept_id:
-                if r['p_broader_given_narrower'] >= min_p_broader and r['asymmetry'] >= min_asymmetry:
-                    broader.append(r)
-            elif r['broader_id'] == concept_id:
-                if r['p_broader_given_narrower'] >= min_p_broader and r['asymmetry'] >= min_asymmetry:
-                    narrower.append(r)
+        rels = self.relationships
 
-        for r in self.relationships:
-            if r['cooc_count'] < min_cooc:
+        # One pass over the concept's relationships; merging the two sorted
+        # index lists keeps file order, so ties sort as they always have.
+        for i in heapq.merge(self.by_narrower.get(concept_id, ()),
+                             self.by_broader.get(concept_id, ())):
+            r = rels[i]
+            if r.cooc_count < min_cooc:
                 continue
-            if r['narrower_id'] == concept_id or r['broader_id'] == concept_id:
-                if r['asymmetry'] < min_asymmetry and r['p_broader_given_narrower'] >= 0.2:
-                    symmetric.append(r)
-
-        broader.sort(key=lambda r: r['p_broader_given_narrower'], reverse=True)
-        narrower.sort(key=lambda r: r['p_broader_given_narrower'], reverse=True)
-        symmetric.sort(key=lambda r: r['cooc_count'], reverse=True)
+            if r.asymmetry >= min_asymmetry:
+                if r.narrower_count >= min_count and r.p_broader_given_narrower >= min_p_broader:
+                    if r.narrower_id == concept_id:
+                        broader.append(r)
+                    else:
+                        narrower.append(r)
+            elif r.p_broader_given_narrower >= 0.2:
+                symmetric.append(r)
 
         return {
             'concept_id': concept_id,
             'concept_name': self.concept_names[concept_id],
             'concept_count': self.concept_counts[concept_id],
-            'broader': broader[:50],
-            'narrower': narrower[:50],
-            'symmetric': symmetric[:30],
+            'broader': heapq.nlargest(50, broader, key=lambda r: r.p_broader_given_narrower),
+            'narrower': heapq.nlargest(50, narrower, key=lambda r: r.p_broader_given_narrower),
+            'symmetric': heapq.nlargest(30, symmetric, key=lambda r: r.cooc_count),
         }
 
     def get_all_concepts(self, min_count=5):
@@ -152,19 +393,18 @@ class CooccurrenceEngine:
         children_of: dict[str, list[dict]] = defaultdict(list)
         has_parent: set[str] = set()
 
-        for r in self.relationships:
-            if (r['p_broader_given_narrower'] >= min_p_broader and
-                r['asymmetry'] >= min_asymmetry and
-                r['cooc_count'] >= min_cooc and
-                r['narrower_count'] >= min_count):
-                children_of[r['broader_id']].append({
-                    'id': r['narrower_id'],
-                    'name': r['narrower_name'],
-                    'count': r['narrower_count'],
-                    'p': r['p_broader_given_narrower'],
-                    'asymmetry': r['asymmetry'],
-                })
-                has_parent.add(r['narrower_id'])
+        rels = self.relationships
+        idx = self._filter_indices(min_count, min_cooc, min_p_broader, min_asymmetry)
+        for i in idx.tolist():
+            r = rels[i]
+            children_of[r.broader_id].append({
+                'id': r.narrower_id,
+                'name': r.narrower_name,
+                'count': r.narrower_count,
+                'p': r.p_broader_given_narrower,
+                'asymmetry': r.asymmetry,
+            })
+            has_parent.add(r.narrower_id)
 
         for parent_id in children_of:
             children_of[parent_id].sort(key=lambda x: x['p'], reverse=True)
@@ -180,16 +420,28 @@ class CooccurrenceEngine:
 
         roots.sort(key=lambda x: x['count'], reverse=True)
 
-        def build_subtree(node_id, depth=0, visited=None):
-            if visited is None:
-                visited = set()
-            if node_id in visited or depth > 5:
-                return []
-            visited.add(node_id)
+        # Iterative DFS. Each stack frame is (node id, depth, iterator over
+        # its children, list receiving the child subtrees). visited holds the
+        # ids on the current root-to-node path; a node is removed again once
+        # its children are exhausted.
+        def build_subtree(root_id):
             result = []
-            for child in children_of.get(node_id, []):
-                subtree = build_subtree(child['id'], depth + 1, visited.copy())
-                result.append({**child, 'children': subtree})
+            visited = {root_id}
+            stack = [(root_id, 0, iter(children_of.get(root_id, ())), result)]
+            while stack:
+                node_id, depth, children, out = stack[-1]
+                child = next(children, None)
+                if child is None:
+                    stack.pop()
+                    visited.discard(node_id)
+                    continue
+                subtree = []
+                out.append({**child, 'children': subtree})
+                child_id = child['id']
+                if child_id not in visited and depth < 5:
+                    visited.add(child_id)
+                    stack.append((child_id, depth + 1,
+                                  iter(children_of.get(child_id, ())), subtree))
             return result
 
         tree = []
@@ -220,14 +472,78 @@ engine.load_precomputed(data_path)
 # API Routes
 # =============================================================================
 
+# The engine's data is immutable after load, so responses that depend only
+# on query parameters are serialized once and reused.
+
+def _json_response(body: bytes):
+    return Response(body, mimetype='application/json')
+
+
+def _byte_bounded_cache(max_bytes: int, max_entry_bytes: int):
+    """LRU cache for functions returning bytes or a sequence of bytes chunks,
+    bounded by the total size of the cached results rather than entry count.
+
+    Results larger than max_entry_bytes are returned but never cached.
+    """
+    def decorator(fn):
+        cache: OrderedDict[tuple, tuple[object, int]] = OrderedDict()
+        lock = threading.Lock()
+        cached_bytes = 0
+
+        @functools.wraps(fn)
+        def wrapper(*args):
+            nonlocal cached_bytes
+            with lock:
+                if args in cache:
+                    cache.move_to_end(args)
+                    return cache[args][0]
+            value = fn(*args)
+            size = len(value) if isinstance(value, bytes) else sum(map(len, value))
+            if size <= max_entry_bytes:
+                with lock:
+                    if args not in cache:
+                        cache[args] = (value, size)
+                        cached_bytes += size
+                        while cached_bytes > max_bytes:
+                            _, (_, evicted) = cache.popitem(last=False)
+                            cached_bytes -= evicted
+            return value
+        return wrapper
+    return decorator
+
+
+@functools.lru_cache(maxsize=1)
+def _stats_json() -> bytes:
+    return orjson.dumps(engine.get_stats())
+
+
+# min_count is free-form and a low one returns every concept (~0.5 MB)
+@_byte_bounded_cache(max_bytes=4 * 1024 * 1024, max_entry_bytes=1024 * 1024)
+def _concepts_json(min_count: int) -> bytes:
+    return orjson.dumps(engine.get_all_concepts(min_count=min_count))
+
+
+# Trees at low thresholds run to several MB and the parameters are free-form
+# floats, so the cache is capped by size; the UI's parameter sets fit.
+@_byte_bounded_cache(max_bytes=8 * 1024 * 1024, max_entry_bytes=1024 * 1024)
+def _hierarchy_tree_roots(min_p_broader: float, min_asymmetry: float,
+                          min_cooc: int, min_count: int) -> tuple[bytes, ...]:
+    return tuple(orjson.dumps(root) for root in engine.build_hierarchy_tree(
+        min_p_broader=min_p_broader,
+        min_asymmetry=min_asymmetry,
+        min_cooc=min_cooc,
+        min_count=min_count,
+    ))
+
+
 @app.route('/api/stats')
 def api_stats():
-    return jsonify(engine.get_stats())
+    return _json_response(_stats_json())
 
 
 @app.route('/api/relationships')
 def api_relationships():
-    results, total = engine.get_filtered_relationships(
+    idx, total = engine.filter_relationship_indices(
         min_narrower_count=int(request.args.get('min_count', 10)),
         min_cooc=int(request.args.get('min_cooc', 5)),
         min_p_broader=float(request.args.get('min_p', 0.3)),
@@ -237,7 +553,10 @@ def api_relationships():
         sort_desc=request.args.get('desc', 'true') == 'true',
         limit=int(request.args.get('limit', 500)),
     )
-    return jsonify({'results': results, 'total': total})
+    rel_json = engine.rel_json
+    body = (b'{"results":[' + b','.join([rel_json[i] for i in idx.tolist()]) +
+            b'],"total":' + str(total).encode() + b'}')
+    return _json_response(body)
 
 
 @app.route('/api/concept_tree')
@@ -253,25 +572,29 @@ def api_concept_tree():
         min_cooc=int(request.args.get('min_cooc', 3)),
         min_count=int(request.args.get('min_count', 5)),
     )
-    return jsonify(tree)
+    return _json_response(orjson.dumps(tree))
 
 
 @app.route('/api/hierarchy_tree')
 def api_hierarchy_tree():
-    tree = engine.build_hierarchy_tree(
-        min_p_broader=float(request.args.get('min_p', 0.5)),
-        min_asymmetry=float(request.args.get('min_asym', 2.0)),
-        min_cooc=int(request.args.get('min_cooc', 5)),
-        min_count=int(request.args.get('min_count', 10)),
+    args = (
+        float(request.args.get('min_p', 0.5)),
+        float(request.args.get('min_asym', 2.0)),
+        int(request.args.get('min_cooc', 5)),
+        int(request.args.get('min_count', 10)),
     )
-    return jsonify(tree)
+    roots = _hierarchy_tree_roots(*args)
+    if request.args.get('format') == 'ndjson':
+        # One root per line, so the client can render roots as they arrive
+        return Response((root + b'\n' for root in roots),
+                        mimetype='application/x-ndjson')
+    return _json_response(b'[' + b','.join(roots) + b']')
 
 
 @app.route('/api/concepts')
 def api_concepts():
     min_count = int(request.args.get('min_count', 5))
-    concepts = engine.get_all_concepts(min_count=min_count)
-    return jsonify(concepts)
+    return _json_response(_concepts_json(min_count))
 
 
 @app.route('/api/export_yaml')
@@ -293,28 +616,40 @@ def api_export_yaml():
 
     groups: dict[str, list] = defaultdict(list)
     for r in results:
-        groups[r['broader_name']].append(r)
-
-    lines = [
-        "# CB Co-occurrence Relationships (Empirically Derived)",
-        f"# Filters: P(broader|narrower) >= {min_p}, asymmetry >= {min_asym}, "
-        f"co-occurrences >= {min_cooc}, min citations >= {min_count}",
-        f"# Total relationships: {total}",
-        "",
-        "cb_cooccurrence:",
-    ]
-
-    for broader_name in sorted(groups.keys()):
-        narrower_list = groups[broader_name]
-        narrower_list.sort(key=lambda r: r['p_broader_given_narrower'], reverse=True)
-        lines.append(f"  - broader: {broader_name}")
-        lines.append(f"    narrower:")
-        for r in narrower_list:
-            pct = round(r['p_broader_given_narrower'] * 100, 1)
-            lines.append(f"      - {r['narrower_name']}  # {pct}%")
-        lines.append("")
-
-    return '\n'.join(lines), 200, {'Content-Type': 'text/plain; charset=utf-8'}
+        groups[r.broader_name].append(r)
+
+    def generate_lines():
+        yield "# CB Co-occurrence Relationships (Empirically Derived)"
+        yield (f"# Filters: P(broader|narrower) >= {min_p}, asymmetry >= {min_asym}, "
+               f"co-occurrences >= {min_cooc}, min citations >= {min_count}")
+        yield f"# Total relationships: {total}"
+        yield ""
+        yield "cb_cooccurrence:"
+        for broader_name in sorted(groups.keys()):
+            narrower_list = groups[broader_name]
+            narrower_list.sort(key=lambda r: r.p_broader_given_narrower, reverse=True)
+            yield f"  - broader: {broader_name}"
+            yield f"    narrower:"
+            for r in narrower_list:
+                pct = round(r.p_broader_given_narrower * 100, 1)
+                yield f"      - {r.narrower_name}  # {pct}%"
+            yield ""
+
+    def generate():
+        # Join lines in batches so each WSGI write carries a useful chunk;
+        # the output is byte-identical to a single '\n'.join().
+        buf = []
+        sep = ''
+        for line in generate_lines():
+            buf.append(line)
+            if len(buf) >= 100:
+                yield sep + '\n'.join(buf)
+                sep = '\n'
+                buf = []
+        if buf:
+            yield sep + '\n'.join(buf)
+
+    return Response(generate(), content_type='text/plain; charset=utf-8')
 
 
 # =============================================================================
@@ -323,7 +658,19 @@ def api_export_yaml():
 
 @app.route('/')
 def index():
-    return render_template_string(HTML_TEMPLATE)
+    for encoding, body in _INDEX_ENCODED:
+        if request.accept_encodings[encoding] > 0:
+            response = Response(body, mimetype='text/html')
+            response.headers['Content-Encoding'] = encoding
+            response.set_etag(f'{_INDEX_ETAG}-{encoding}')
+            break
+    else:
+        response = Response(_INDEX_BYTES, mimetype='text/html')
+        response.set_etag(_INDEX_ETAG)
+    response.vary.add('Accept-Encoding')
+    response.headers['Cache-Control'] = 'public, max-age=300, must-revalidate'
+    # Answers a matching If-None-Match with an empty 304
+    return response.make_conditional(request)
 
 
 HTML_TEMPLATE = """
@@ -333,6 +680,8 @@ HTML_TEMPLATE = """
 <meta charset="UTF-8">
 <meta name="viewport" content="width=device-width, initial-scale=1.0">
 <title>Subject Hierarchy Explorer — IsisCB</title>
+<link rel="preload" href="/api/stats" as="fetch" crossorigin>
+<link rel="preload" href="/api/relationships?min_p=0.3&amp;min_asym=1.5&amp;min_cooc=5&amp;min_count=10&amp;sort=asymmetry&amp;desc=true&amp;limit=500" as="fetch" crossorigin>
 <style>
 :root {
     --deep-space-blue: #173753;
@@ -469,6 +818,21 @@ th.sorted .sort-arrow { opacity: 1; }
 td { padding: 8px 12px; border-top: 1px solid #f0f0f0; }
 tr:hover { background: #fafbfc; }
 
+/* Virtualized relationships table: fixed columns and one-line rows keep
+   every row the same height while only the visible window is rendered */
+.table-scroll { max-height: 70vh; overflow-y: auto; border-radius: 8px; box-shadow: 0 1px 3px rgba(0,0,0,0.08); }
+.table-scroll table { table-layout: fixed; box-shadow: none; overflow: visible; }
+.table-scroll thead th { position: sticky; top: 0; z-index: 2; }
+.table-scroll th:nth-child(1), .table-scroll th:nth-child(2) { width: 22%; }
+.table-scroll th:nth-child(3), .table-scroll th:nth-child(4) { width: 14%; }
+.table-scroll th:nth-child(5), .table-scroll th:nth-child(6) { width: 9%; }
+.table-scroll th:nth-child(7) { width: 10%; }
+.table-scroll td { white-space: nowrap; overflow: hidden; text-overflow: ellipsis; }
+.table-scroll td.rel-spacer { padding: 0; border: 0; }
+/* Header tooltips open downwards so the scroll container does not clip them */
+.table-scroll th.has-tooltip .tooltip { bottom: auto; top: calc(100% + 8px); }
+.table-scroll th.has-tooltip .tooltip::after { top: auto; bottom: 100%; border-top-color: transparent; border-bottom-color: var(--deep-space-blue); }
+
 .concept-link { color: var(--color-primary); cursor: pointer; text-decoration: none; }
 .concept-link:hover { text-decoration: underline; }
 
@@ -509,7 +873,12 @@ tr:hover { background: #fafbfc; }
 .rel-item .meta { font-size: 11px; color: #888; font-family: var(--font-mono); }
 
 .tree-container { background: white; border-radius: 8px; padding: 20px; box-shadow: 0 1px 3px rgba(0,0,0,0.08); }
-.tree-node { padding-left: 24px; position: relative; }
+/* Off-screen nodes skip layout and paint; "auto" keeps an expanded
+   subtree's last rendered height as its placeholder */
+.tree-node {
+    padding-left: 24px; position: relative;
+    content-visibility: auto; contain-intrinsic-size: auto 28px;
+}
 .tree-node::before { content: ''; position: absolute; left: 8px; top: 0; bottom: 0; width: 1px; background: #e5e7eb; }
 .tree-item { display: flex; align-items: center; gap: 8px; padding: 4px 0; position: relative; }
 .tree-item::before { content: ''; position: absolute; left: -16px; top: 50%; width: 12px; height: 1px; background: #e5e7eb; }
@@ -681,6 +1050,7 @@ tr:hover { background: #fafbfc; }
         </div>
     </div>
     <div class="results-info" id="resultsInfo"></div>
+    <div class="table-scroll" id="relScroll">
     <table id="relTable">
         <thead>
             <tr>
@@ -702,6 +1072,7 @@ tr:hover { background: #fafbfc; }
         </thead>
         <tbody id="relBody"></tbody>
     </table>
+    </div>
 </div>
 
 <div class="tab-content" id="tab-explorer">
@@ -866,101 +1237,294 @@ tr:hover { background: #fafbfc; }
 let currentSort = 'asymmetry';
 let currentSortDesc = true;
 
+// Query string from a plain object; empty values are left out so the
+// default requests line up with their cache and preload URLs.
+const q = (o) => {
+    let s = '';
+    for (const k in o) {
+        const v = o[k];
+        if (v === '' || v == null) continue;
+        s += (s ? '&' : '') + k + '=' + encodeURIComponent(v);
+    }
+    return s;
+};
+
+// LRU cache of parsed GET responses, keyed on URL, bounded by entry count
+// and by the size of the responses. Only successful responses are kept;
+// aborted or failed requests are simply not cached.
+const _apiCache = new Map();
+const API_CACHE_MAX = 64;
+const API_CACHE_MAX_BYTES = 8 * 1024 * 1024;
+// Larger responses (e.g. trees at the lowest thresholds) are not kept
+const API_CACHE_MAX_ENTRY_BYTES = 1024 * 1024;
+let _apiCacheBytes = 0;
+
+async function cachedFetch(url, init, parse = r => r.json()) {
+    const entry = _apiCache.get(url);
+    if (entry) {
+        _apiCache.delete(url);
+        _apiCache.set(url, entry);
+        return entry.value;
+    }
+    const resp = await fetch(url, init);
+    const value = await parse(resp);
+    if (resp.ok) {
+        const size = Number(resp.headers.get('Content-Length')) ||
+            (typeof value === 'string' ? value.length : 0);
+        cacheStore(url, value, size);
+    }
+    return value;
+}
+
+function cacheStore(url, value, size) {
+    if (size > API_CACHE_MAX_ENTRY_BYTES) return;
+    const old = _apiCache.get(url);
+    if (old) { _apiCache.delete(url); _apiCacheBytes -= old.size; }
+    _apiCache.set(url, { value, size });
+    _apiCacheBytes += size;
+    while (_apiCache.size > API_CACHE_MAX || _apiCacheBytes > API_CACHE_MAX_BYTES) {
+        const [oldest, evicted] = _apiCache.entries().next().value;
+        _apiCache.delete(oldest);
+        _apiCacheBytes -= evicted.size;
+    }
+}
+
+// Tab headers and panels, looked up once; switching only touches the
+// outgoing and incoming pair.
+const TAB_NAMES = ['relationships', 'explorer', 'tree', 'export', 'about'];
+const _tabs = {};
+const _tabPanels = {};
+document.querySelectorAll('.tab').forEach((el, i) => { _tabs[TAB_NAMES[i]] = el; });
+TAB_NAMES.forEach(n => { _tabPanels[n] = document.getElementById('tab-' + n); });
+let _activeTab = 'relationships';
+
 function switchTab(name) {
-    document.querySelectorAll('.tab').forEach(t => t.classList.remove('active'));
-    document.querySelectorAll('.tab-content').forEach(t => t.classList.remove('active'));
-    const tabs = document.querySelectorAll('.tab');
-    const tabNames = ['relationships', 'explorer', 'tree', 'export', 'about'];
-    const idx = tabNames.indexOf(name);
-    if (idx >= 0) tabs[idx].classList.add('active');
-    document.getElementById('tab-' + name).classList.add('active');
+    if (!_tabPanels[name] || name === _activeTab) return;
+    _tabs[_activeTab].classList.remove('active');
+    _tabPanels[_activeTab].classList.remove('active');
+    _tabs[name].classList.add('active');
+    _tabPanels[name].classList.add('active');
+    _activeTab = name;
 }
 
+// Header stats change only when the dataset is regenerated: paint the copy
+// remembered in localStorage straight away, then refresh it from the server.
+const STATS_KEY = 'hdrStats';
+const STATS_MAX_AGE = 24 * 3600 * 1000;
+
 async function loadStats() {
+    try {
+        const cached = JSON.parse(localStorage.getItem(STATS_KEY) || 'null');
+        if (cached && Date.now() - cached.t < STATS_MAX_AGE) renderStats(cached.d);
+    } catch (err) { /* storage unavailable or entry unusable; the fetch below replaces it */ }
     const resp = await fetch('/api/stats');
     const data = await resp.json();
+    renderStats(data);
+    try { localStorage.setItem(STATS_KEY, JSON.stringify({ t: Date.now(), d: data })); } catch (err) { /* storage unavailable */ }
+}
+
+function renderStats(data) {
     document.getElementById('headerStats').innerHTML =
         `${data.total_concepts.toLocaleString()} concepts &middot; ` +
         `${data.total_citations.toLocaleString()} citations &middot; ` +
         `${data.total_pairs.toLocaleString()} co-occurring pairs`;
 }
 
+// Rendered bars and badges, keyed on their inputs: rows share a small set of
+// rounded percentages and asymmetry values, so most lookups hit.
+const _barCache = new Map();
+const _badgeCache = new Map();
+
 function probBar(value, color) {
     const pct = Math.round(value * 100);
+    const key = color ? pct + '|' + color : pct;
+    let html = _barCache.get(key);
+    if (html) return html;
     const barColor = color || (pct >= 80 ? '#28a745' : pct >= 50 ? '#e9a100' : '#6b7280');
-    return `<div class="prob-bar">
+    html = `<div class="prob-bar">
         <div class="prob-bar-track"><div class="prob-bar-fill" style="width:${pct}%;background:${barColor}"></div></div>
         <span class="prob-value">${pct}%</span>
     </div>`;
+    _barCache.set(key, html);
+    return html;
 }
 
 function asymBadge(value) {
-    if (value >= 5) return `<span class="badge badge-strong">${value}x</span>`;
-    if (value >= 2.5) return `<span class="badge badge-moderate">${value}x</span>`;
-    return `<span class="badge badge-weak">${value}x</span>`;
+    let html = _badgeCache.get(value);
+    if (html) return html;
+    const cls = value >= 5 ? 'badge-strong' : value >= 2.5 ? 'badge-moderate' : 'badge-weak';
+    html = `<span class="badge ${cls}">${value}x</span>`;
+    _badgeCache.set(value, html);
+    return html;
 }
 
 function sortBy(field) {
     if (currentSort === field) { currentSortDesc = !currentSortDesc; }
     else { currentSort = field; currentSortDesc = true; }
+    // The loaded rows are the whole result for these filters: reorder them
+    // here instead of asking the server again.
+    if (_relRowsFilters !== null && _relRowsFilters === q(relFilters()) && field in REL_SORT_KEYS) {
+        clearTimeout(_relTimer);
+        if (_relAbort) _relAbort.abort();
+        showRelRows(sortRelRows(_relRows, field, currentSortDesc));
+        return;
+    }
     loadRelationships();
 }
 
-async function loadRelationships() {
-    const params = new URLSearchParams({
+// Client-side equivalents of the server's sort keys
+const REL_SORT_KEYS = {
+    asymmetry: r => r.asymmetry,
+    p_broader_given_narrower: r => r.p_broader_given_narrower,
+    cooc_count: r => r.cooc_count,
+    narrower_name: r => r.narrower_name.toLowerCase(),
+    broader_name: r => r.broader_name.toLowerCase(),
+};
+
+// Stable sort of a copy; rows may be shared with the response cache
+function sortRelRows(rows, field, desc) {
+    const key = REL_SORT_KEYS[field];
+    const sign = desc ? -1 : 1;
+    const keyed = rows.map(r => [key(r), r]);
+    keyed.sort((a, b) => a[0] < b[0] ? -sign : a[0] > b[0] ? sign : 0);
+    return keyed.map(k => k[1]);
+}
+
+let _relAbort = null;
+let _relTimer = null;
+
+function loadRelationships() {
+    clearTimeout(_relTimer);
+    _relTimer = setTimeout(fetchRelationships, 150);
+}
+
+function relFilters() {
+    return {
         filter: document.getElementById('filterText').value,
         min_p: document.getElementById('filterMinP').value,
         min_asym: document.getElementById('filterMinAsym').value,
         min_cooc: document.getElementById('filterMinCooc').value,
         min_count: document.getElementById('filterMinCount').value,
-        sort: currentSort, desc: currentSortDesc, limit: 500,
-    });
-    const resp = await fetch('/api/relationships?' + params);
-    const data = await resp.json();
+    };
+}
+
+// With the default filters this requests the URL preloaded in <head>
+async function fetchRelationships() {
+    if (_relAbort) _relAbort.abort();
+    const abort = _relAbort = new AbortController();
+    const filters = relFilters();
+    const params = q({ ...filters, sort: currentSort, desc: currentSortDesc, limit: 500 });
+    let data;
+    try {
+        data = await cachedFetch('/api/relationships?' + params, { signal: abort.signal });
+    } catch (err) {
+        if (err.name === 'AbortError') return;
+        throw err;
+    }
     document.getElementById('resultsInfo').textContent =
         `Showing ${data.results.length} of ${data.total} relationships`;
+    _relRowsFilters = data.results.length === data.total ? q(filters) : null;
+    showRelRows(data.results);
+}
+
+function showRelRows(rows) {
+    _relRows = rows;
+    document.getElementById('relScroll').scrollTop = 0;
+    _relWindowStart = -1;
+    renderRelWindow();
+}
+
+// The table only renders the rows in and around the visible part of the
+// scroll container; spacer rows stand in for the rest.
+let _relRows = [];
+// Query string of the filters _relRows was loaded with, if it is the full result
+let _relRowsFilters = null;
+let _relRowH = 37;
+let _relRowHMeasured = false;
+let _relWindowStart = -1;
+let _relScrollPending = false;
+const REL_OVERSCAN = 10;
+
+function renderRelWindow() {
+    const scroller = document.getElementById('relScroll');
     const tbody = document.getElementById('relBody');
-    tbody.innerHTML = data.results.map(r => `
-        <tr>
-            <td><a class="concept-link" onclick="jumpToConcept('${escHtml(r.narrower_name)}')">${escHtml(r.narrower_name)}</a></td>
-            <td><a class="concept-link" onclick="jumpToConcept('${escHtml(r.broader_name)}')">${escHtml(r.broader_name)}</a></td>
-            <td>${probBar(r.p_broader_given_narrower)}</td>
-            <td>${probBar(r.p_narrower_given_broader, '#6b7280')}</td>
-            <td>${asymBadge(r.asymmetry)}</td>
-            <td style="font-family:var(--font-mono);font-size:12px;">${r.cooc_count}</td>
-            <td style="font-size:11px;color:#888;">${r.narrower_count} / ${r.broader_count}</td>
-        </tr>
-    `).join('');
+    const n = _relRows.length;
+    // Size the window for the container's max-height (70vh), not its current
+    // height: it is still short while the previous result was small.
+    const viewH = Math.max(scroller.clientHeight, innerHeight * 0.7);
+    const count = Math.ceil(viewH / _relRowH) + 2 * REL_OVERSCAN;
+    const first = Math.floor(scroller.scrollTop / _relRowH) - REL_OVERSCAN;
+    const start = Math.max(0, Math.min(first, n - count));
+    if (start === _relWindowStart) return;
+    _relWindowStart = start;
+    const end = Math.min(n, start + count);
+    // Build the window as one string and hand it to the parser once
+    let html = start > 0 ? relSpacerHtml(start * _relRowH) : '';
+    for (let i = start; i < end; i++) html += relRowHtml(_relRows[i]);
+    if (end < n) html += relSpacerHtml((n - end) * _relRowH);
+    tbody.innerHTML = html;
+    if (!_relRowHMeasured && end > start) {
+        const row = tbody.rows[start > 0 ? 1 : 0];
+        if (row && row.offsetHeight) {
+            _relRowHMeasured = true;
+            if (row.offsetHeight !== _relRowH) {
+                _relRowH = row.offsetHeight;
+                _relWindowStart = -1;
+                renderRelWindow();
+            }
+        }
+    }
+}
+
+function relSpacerHtml(height) {
+    return `<tr><td class="rel-spacer" colspan="7" style="height:${height}px"></td></tr>`;
+}
+
+document.getElementById('relScroll').addEventListener('scroll', () => {
+    if (_relScrollPending) return;
+    _relScrollPending = true;
+    requestAnimationFrame(() => { _relScrollPending = false; renderRelWindow(); });
+});
+
+function relRowHtml(r) {
+    return '<tr>' +
+        `<td title="${escHtml(r.narrower_name)}"><a class="concept-link" data-concept="${escHtml(r.narrower_name)}">${escHtml(r.narrower_name)}</a></td>` +
+        `<td title="${escHtml(r.broader_name)}"><a class="concept-link" data-concept="${escHtml(r.broader_name)}">${escHtml(r.broader_name)}</a></td>` +
+        `<td>${probBar(r.p_broader_given_narrower)}</td>` +
+        `<td>${probBar(r.p_narrower_given_broader, '#6b7280')}</td>` +
+        `<td>${asymBadge(r.asymmetry)}</td>` +
+        `<td style="font-family:var(--font-mono);font-size:12px;">${r.cooc_count}</td>` +
+        `<td style="font-size:11px;color:#888;">${r.narrower_count} / ${r.broader_count}</td>` +
+        '</tr>';
 }
 
 async function exploreConcept(name) {
     const conceptName = name || document.getElementById('conceptInput').value;
     if (!conceptName.trim()) return;
     document.getElementById('conceptInput').value = conceptName;
-    const params = new URLSearchParams({ concept: conceptName, min_p: 0.2, min_asym: 1.3, min_cooc: 3, min_count: 5 });
-    const resp = await fetch('/api/concept_tree?' + params);
-    const data = await resp.json();
+    const params = q({ concept: conceptName, min_p: 0.2, min_asym: 1.3, min_cooc: 3, min_count: 5 });
+    const data = await cachedFetch('/api/concept_tree?' + params);
     const container = document.getElementById('conceptResults');
     if (data.suggestions) {
         container.innerHTML = `<div class="suggestions"><p style="margin-bottom:10px;font-weight:600;">Did you mean:</p>
-            ${data.suggestions.map(s => `<span class="suggestion-item" onclick="exploreConcept('${escHtml(s.name)}')">${escHtml(s.name)} <span class="suggestion-count">(${s.count})</span></span>`).join('')}</div>`;
+            ${data.suggestions.map(s => `<span class="suggestion-item" data-concept="${escHtml(s.name)}">${escHtml(s.name)} <span class="suggestion-count">(${s.count})</span></span>`).join('')}</div>`;
         return;
     }
     let html = `<div style="margin-bottom:16px;font-size:16px;font-weight:600;">${escHtml(data.concept_name)} <span style="font-size:13px;font-weight:400;color:#888;margin-left:8px;">${data.concept_count} citations</span></div>`;
     html += '<div class="concept-detail">';
     html += `<div class="concept-panel broader"><h3>Broader Terms (${data.broader.length})</h3><p style="font-size:11px;color:#888;margin-bottom:8px;">When "${escHtml(data.concept_name)}" appears, these also tend to appear</p>`;
     if (data.broader.length === 0) { html += '<div style="color:#888;font-size:13px;">No broader terms found at current thresholds</div>'; }
-    else { html += data.broader.map(r => `<div class="rel-item"><a class="concept-link name" onclick="exploreConcept('${escHtml(r.broader_name)}')">${escHtml(r.broader_name)}</a><span class="meta">${Math.round(r.p_broader_given_narrower*100)}%</span>${asymBadge(r.asymmetry)}</div>`).join(''); }
+    else { html += data.broader.map(r => `<div class="rel-item"><a class="concept-link name" data-concept="${escHtml(r.broader_name)}">${escHtml(r.broader_name)}</a><span class="meta">${Math.round(r.p_broader_given_narrower*100)}%</span>${asymBadge(r.asymmetry)}</div>`).join(''); }
     html += '</div>';
     html += `<div class="concept-panel narrower"><h3>Narrower Terms (${data.narrower.length})</h3><p style="font-size:11px;color:#888;margin-bottom:8px;">These concepts tend to imply "${escHtml(data.concept_name)}"</p>`;
     if (data.narrower.length === 0) { html += '<div style="color:#888;font-size:13px;">No narrower terms found at current thresholds</div>'; }
-    else { html += data.narrower.map(r => `<div class="rel-item"><a class="concept-link name" onclick="exploreConcept('${escHtml(r.narrower_name)}')">${escHtml(r.narrower_name)}</a><span class="meta">${Math.round(r.p_broader_given_narrower*100)}%</span>${asymBadge(r.asymmetry)}</div>`).join(''); }
+    else { html += data.narrower.map(r => `<div class="rel-item"><a class="concept-link name" data-concept="${escHtml(r.narrower_name)}">${escHtml(r.narrower_name)}</a><span class="meta">${Math.round(r.p_broader_given_narrower*100)}%</span>${asymBadge(r.asymmetry)}</div>`).join(''); }
     html += '</div>';
     if (data.symmetric.length > 0) {
         html += `<div class="concept-panel symmetric full-width"><h3>Symmetric / Peer Relationships (${data.symmetric.length})</h3><p style="font-size:11px;color:#888;margin-bottom:8px;">Concepts that frequently co-occur without a clear hierarchy</p>`;
         html += data.symmetric.map(r => {
             const otherName = r.narrower_name === data.concept_name ? r.broader_name : r.narrower_name;
-            return `<div class="rel-item"><a class="concept-link name" onclick="exploreConcept('${escHtml(otherName)}')">${escHtml(otherName)}</a><span class="meta">${r.cooc_count} co-occ</span></div>`;
+            return `<div class="rel-item"><a class="concept-link name" data-concept="${escHtml(otherName)}">${escHtml(otherName)}</a><span class="meta">${r.cooc_count} co-occ</span></div>`;
         }).join('');
         html += '</div>';
     }
@@ -968,73 +1532,240 @@ async function exploreConcept(name) {
     container.innerHTML = html;
 }
 
+// Rendered rows, panels and tree nodes carry data-concept attributes; one
+// delegated click listener per container replaces per-element handlers.
+function onConceptClick(containerId, handler) {
+    document.getElementById(containerId).addEventListener('click', e => {
+        const el = e.target.closest('[data-concept]');
+        if (el) handler(el.dataset.concept);
+    });
+}
+onConceptClick('relBody', name => jumpToConcept(name));
+onConceptClick('conceptResults', name => exploreConcept(name));
+onConceptClick('treeContainer', name => jumpToConcept(name));
+document.getElementById('treeContainer').addEventListener('click', e => {
+    const btn = e.target.closest('.tree-toggle');
+    if (btn) toggleTreeNode(btn);
+});
+
 function jumpToConcept(name) {
     document.getElementById('conceptInput').value = name;
     switchTab('explorer');
     exploreConcept(name);
 }
 
+let _treeAbort = null;
+
 async function loadTree() {
+    if (_treeAbort) _treeAbort.abort();
+    const abort = _treeAbort = new AbortController();
     const container = document.getElementById('treeContainer');
     container.innerHTML = '<div class="loading">Building hierarchy tree...</div>';
-    const params = new URLSearchParams({
+    const url = '/api/hierarchy_tree?' + q({
         min_p: document.getElementById('treeMinP').value,
         min_asym: document.getElementById('treeMinAsym').value,
         min_cooc: document.getElementById('treeMinCooc').value,
         min_count: document.getElementById('treeMinCount').value,
     });
-    const resp = await fetch('/api/hierarchy_tree?' + params);
-    const tree = await resp.json();
+    _treePending = [];
+    let tree, size;
+    if (_apiCache.has(url)) {
+        tree = await cachedFetch(url);
+        container.innerHTML = TREE_SUMMARY + renderTree(tree, true);
+    } else {
+        try {
+            ({ tree, size } = await streamTree(url + '&format=ndjson', container, abort.signal));
+        } catch (err) {
+            if (err.name === 'AbortError') return;
+            throw err;
+        }
+        cacheStore(url, tree, size);
+    }
     if (tree.length === 0) { container.innerHTML = '<div class="empty-state">No hierarchy found at these thresholds. Try lowering the filters.</div>'; return; }
-    container.innerHTML = `<p style="margin-bottom:16px;font-size:13px;color:#666;">${tree.length} root concepts found. Click arrows to expand/collapse.</p>` + tree.map(node => renderTreeNode(node, true)).join('');
+    document.getElementById('treeSummary').textContent = `${tree.length} root concepts found. Click arrows to expand/collapse.`;
+}
+
+const TREE_SUMMARY = '<p id="treeSummary" style="margin-bottom:16px;font-size:13px;color:#666;"></p>';
+
+// Reads the NDJSON form of the tree, appending each batch of complete
+// lines as it arrives instead of waiting for the whole body. Returns the
+// roots and the body size (in characters) for the response cache.
+async function streamTree(url, container, signal) {
+    const resp = await fetch(url, { signal });
+    if (!resp.ok) throw new Error(`Tree request failed: ${resp.status}`);
+    const reader = resp.body.pipeThrough(new TextDecoderStream()).getReader();
+    const tree = [];
+    let rest = '', size = 0;
+    container.innerHTML = TREE_SUMMARY;
+    for (;;) {
+        const { value, done } = await reader.read();
+        signal.throwIfAborted();
+        if (!done) size += value.length;
+        // At the end, whatever is left is the last line, newline or not
+        const lines = done ? [rest] : (rest + value).split('\\n');
+        rest = done ? '' : lines.pop();
+        const roots = lines.filter(line => line).map(line => JSON.parse(line));
+        if (roots.length > 0) {
+            for (const root of roots) tree.push(root);
+            container.insertAdjacentHTML('beforeend', renderTree(roots, true));
+        }
+        if (done) break;
+    }
+    return { tree, size };
 }
 
-function renderTreeNode(node, isRoot) {
-    const hasChildren = node.children && node.children.length > 0;
+// Children are rendered lazily: a node's child list is parked in
+// _treePending and its container stays empty until first expanded.
+let _treePending = [];
+
+function renderTree(nodes, isRoot) {
+    const buf = [];
+    for (const node of nodes) {
+        const hasChildren = node.children && node.children.length > 0;
+        buf.push(treeItemHtml(node, isRoot, hasChildren));
+        if (hasChildren) {
+            buf.push(`<div class="tree-children" data-pending="${_treePending.length}" style="display:none;"></div>`);
+            _treePending.push(node.children);
+        }
+        buf.push('</div>');
+    }
+    return buf.join('');
+}
+
+// Opening markup of one node, up to (not including) its children
+function treeItemHtml(node, isRoot, hasChildren) {
     const rootClass = isRoot ? ' tree-root' : '';
     const probStr = node.p ? `<span class="tree-prob">${Math.round(node.p * 100)}%</span>` : '';
-    let html = `<div class="tree-node${rootClass}"><div class="tree-item">
-        ${hasChildren ? `<button class="tree-toggle" onclick="toggleTreeNode(this)">+</button>` : '<span style="width:18px;display:inline-block;"></span>'}
-        <a class="concept-link tree-label" onclick="jumpToConcept('${escHtml(node.name)}')">${escHtml(node.name)}</a>
-        <span class="tree-count">(${node.count})</span>${probStr}</div>`;
-    if (hasChildren) {
-        html += `<div class="tree-children" style="display:none;">`;
-        html += node.children.map(child => renderTreeNode(child, false)).join('');
-        html += '</div>';
-    }
-    html += '</div>';
-    return html;
+    return `<div class="tree-node${rootClass}"><div class="tree-item">` +
+        (hasChildren ? '<button class="tree-toggle">+</button>' : '<span style="width:18px;display:inline-block;"></span>') +
+        `<a class="concept-link tree-label" data-concept="${escHtml(node.name)}">${escHtml(node.name)}</a>` +
+        `<span class="tree-count">(${node.count})</span>${probStr}</div>`;
 }
 
 function toggleTreeNode(btn) {
-    const children = btn.closest('.tree-node').querySelector('.tree-children');
-    if (children) { const h = children.style.display === 'none'; children.style.display = h ? 'block' : 'none'; btn.textContent = h ? '\u2212' : '+'; }
+    const children = btn.closest('.tree-node').querySelector(':scope > .tree-children');
+    if (!children) return;
+    const pending = children.dataset.pending;
+    if (pending !== undefined) {
+        children.innerHTML = renderTree(_treePending[pending], false);
+        _treePending[pending] = null;
+        delete children.dataset.pending;
+    }
+    const h = children.style.display === 'none'; children.style.display = h ? 'block' : 'none'; btn.textContent = h ? '\u2212' : '+';
 }
 
 async function loadExport() {
-    const params = new URLSearchParams({
+    const params = q({
         min_p: document.getElementById('exportMinP').value,
         min_asym: document.getElementById('exportMinAsym').value,
         min_cooc: document.getElementById('exportMinCooc').value,
         min_count: document.getElementById('exportMinCount').value,
     });
-    const resp = await fetch('/api/export_yaml?' + params);
-    const text = await resp.text();
+    const text = await cachedFetch('/api/export_yaml?' + params, undefined, r => r.text());
     document.getElementById('exportContent').textContent = text;
 }
 
+// Single-pass escape, memoized: the same concept names recur across rows
+const _ESC_RE = /[&<>"']/g;
+const _ESC = { '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;' };
+const _escCache = new Map();
+
 function escHtml(str) {
-    return String(str).replace(/&/g,'&amp;').replace(/</g,'&lt;').replace(/>/g,'&gt;').replace(/"/g,'&quot;').replace(/'/g,'&#39;');
+    const s = String(str);
+    let v = _escCache.get(s);
+    if (v !== undefined) return v;
+    v = s.replace(_ESC_RE, c => _ESC[c]);
+    if (_escCache.size < 4096) _escCache.set(s, v);
+    return v;
 }
 
 loadStats();
-loadRelationships();
+fetchRelationships();
 </script>
 </body>
 </html>
 """
 
 
+_CSS_RULE_RE = re.compile(r'([^{}@]+)\{([^{}]*)\}')
+_CSS_CLASS_RE = re.compile(r'\.(-?[_a-zA-Z][\w-]*)')
+# Commas separating a selector list, i.e. not inside (...) or [...]
+_CSS_LIST_SEP_RE = re.compile(r',(?![^(\[]*[)\]])')
+# Pseudo-class arguments and attribute selectors; a class named in these
+# need not be present for the selector to match (e.g. a:not(.x)).
+_CSS_ARGS_RE = re.compile(r'\([^()]*\)|\[[^\]]*\]')
+
+
+def _required_classes(selector: str) -> list[str]:
+    while True:
+        stripped = _CSS_ARGS_RE.sub('', selector)
+        if stripped == selector:
+            return _CSS_CLASS_RE.findall(selector)
+        selector = stripped
+
+
+def _purge_css(css: str, markup: str) -> str:
+    """Drop selectors using a class that markup never mentions, and merge
+    neighbouring rules with identical declarations.
+
+    css is csscompressor output; anything other than a flat run of plain
+    rules (e.g. at-rules) is returned untouched.
+    """
+    parsed = _CSS_RULE_RE.findall(css)
+    if sum(len(sel) + len(body) + 2 for sel, body in parsed) != len(css):
+        return css
+    rules: list[tuple[list[str], str]] = []
+    for selectors, body in parsed:
+        kept = [sel for sel in _CSS_LIST_SEP_RE.split(selectors)
+                if all(cls in markup for cls in _required_classes(sel))]
+        if not kept:
+            continue
+        # Vendor pseudo-selectors stay in their own rule: a selector list
+        # is dropped whole by browsers that reject any part of it.
+        if (rules and rules[-1][1] == body and
+                not any(':-' in sel for sel in kept + rules[-1][0])):
+            rules[-1][0].extend(kept)
+        else:
+            rules.append((kept, body))
+    return ''.join(','.join(sels) + '{' + body + '}' for sels, body in rules)
+
+
+def _minify_page(html: str) -> str:
+    """Minify the inline <style> and <script> blocks of a page.
+
+    CSS rules for classes that appear nowhere else in the page are dropped.
+    """
+    markup = re.sub(r'<style>.*?</style>', '', html, flags=re.S)
+    html = re.sub(r'(<style>)(.*?)(</style>)',
+                  lambda m: m[1] + _purge_css(csscompressor.compress(m[2]), markup) + m[3],
+                  html, flags=re.S)
+    html = re.sub(r'(<script>)(.*?)(</script>)',
+                  lambda m: m[1] + rjsmin.jsmin(m[2]) + m[3], html, flags=re.S)
+    return html
+
+
+# HTML_TEMPLATE has no template directives; serve it as-is (minified),
+# encoded once
+_INDEX_BYTES = _minify_page(HTML_TEMPLATE).encode('utf-8')
+# Strong validator for the page; each encoding gets its own suffix
+_INDEX_ETAG = hashlib.blake2b(_INDEX_BYTES, digest_size=16).hexdigest()
+# Precompressed bodies, in order of preference
+_INDEX_ENCODED = [
+    ('br', brotli.compress(_INDEX_BYTES, quality=11)),
+    ('gzip', gzip.compress(_INDEX_BYTES, compresslevel=9, mtime=0)),
+]
+
+
 if __name__ == "__main__":
-    port = int(os.environ.get('PORT', 5030))
-    app.run(host='0.0.0.0', port=port, debug=False)
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--export-binary', metavar='DIR',
+                        help='write the loaded data as a memory-mapped binary data '
+                             'directory and exit')
+    args = parser.parse_args()
+    if args.export_binary:
+        engine.export_binary(args.export_binary)
+        print(f"Wrote binary data to {args.export_binary}")
+    else:
+        port = int(os.environ.get('PORT', 5030))
+        app.run(host='0.0.0.0', port=port, debug=False)